@@ -4,7 +4,7 @@ Centralized ANSI escape code and formatting control.
 """
 import json
 import os
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 
 class AnsiScheme:
@@ -17,6 +17,12 @@ class AnsiScheme:
             config_file: Path to ansi_scheme.json. If None, searches in standard locations.
         """
         self.config = {}
+        # Encoded cursor/screen control sequences, see get_control_bytes()
+        self._control_bytes: Dict[Tuple[str, str], bytes] = {}
+        # Resolved theme role -> escape code, see get_theme_color()
+        self._theme_codes: Dict[str, str] = {}
+        # (direction, lines) -> cursor move sequence, see get_cursor_move()
+        self._cursor_moves: Dict[Tuple[str, int], str] = {}
         self._load_config(config_file)
     
     def _load_config(self, config_file: Optional[str] = None) -> None:
@@ -74,7 +80,8 @@ class AnsiScheme:
             },
             "screen": {
                 "clear_line": "\033[2K",
-                "clear_to_end": "\033[0J"
+                "clear_to_end": "\033[0J",
+                "clear_screen": "\033[2J\033[H"
             }
         }
     
@@ -94,16 +101,23 @@ class AnsiScheme:
     def get_theme_color(self, role: str) -> str:
         """Get ANSI code for a theme color role.
         
+        The role -> color -> code lookup is resolved once per role and reused,
+        since prompts ask for the same roles on every redraw.
+        
         Args:
             role: Theme role ('primary', 'secondary', 'error')
         
         Returns:
             ANSI escape code
         """
-        if role in self.config.get('theme', {}):
-            color_name = self.config['theme'][role]
-            return self.get_color(color_name)
-        return ""
+        code = self._theme_codes.get(role)
+        if code is None:
+            code = ""
+            if role in self.config.get('theme', {}):
+                color_name = self.config['theme'][role]
+                code = self.get_color(color_name)
+            self._theme_codes[role] = code
+        return code
     
     def get_reset(self) -> str:
         """Get ANSI code for reset (clear all formatting).
@@ -132,6 +146,9 @@ class AnsiScheme:
     def get_cursor_move(self, direction: str, lines: int = 1) -> str:
         """Get ANSI code for cursor movement.
         
+        Redraws ask for the same few moves on every keypress, so each
+        (direction, lines) pair is built once and reused.
+        
         Args:
             direction: Direction ('up', 'down', 'left', 'right')
             lines: Number of lines to move
@@ -139,14 +156,19 @@ class AnsiScheme:
         Returns:
             ANSI escape code
         """
-        base_code = self.config.get('cursor_movement', {}).get(direction, '\033[A')
-        return f"\033[{lines}{base_code[-1]}"
+        key = (direction, lines)
+        code = self._cursor_moves.get(key)
+        if code is None:
+            base_code = self.config.get('cursor_movement', {}).get(direction, '\033[A')
+            code = f"\033[{lines}{base_code[-1]}"
+            self._cursor_moves[key] = code
+        return code
     
     def get_screen(self, action: str) -> str:
         """Get ANSI code for screen operation.
         
         Args:
-            action: Action ('clear_line', 'clear_to_end')
+            action: Action ('clear_line', 'clear_to_end', 'clear_screen')
         
         Returns:
             ANSI escape code
@@ -155,6 +177,26 @@ class AnsiScheme:
             return self.config['screen'][action]
         return ""
     
+    def get_control_bytes(self, group: str, action: str) -> bytes:
+        """Get an encoded cursor or screen control sequence.
+        
+        Control sequences do not change once the scheme is loaded, so each
+        one is encoded (UTF-8) on first use and then reused.
+        
+        Args:
+            group: Config section ('cursor' or 'screen')
+            action: Action within that section (e.g. 'hide', 'clear_line')
+        
+        Returns:
+            The escape sequence as bytes (empty if not configured)
+        """
+        key = (group, action)
+        code = self._control_bytes.get(key)
+        if code is None:
+            code = self.config.get(group, {}).get(action, "").encode('utf-8')
+            self._control_bytes[key] = code
+        return code
+    
     def colorize(self, text: str, color: str = 'primary') -> str:
         """Apply color to text.
         
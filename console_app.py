@@ -2,9 +2,35 @@
 Console Application with Menu System
 Main application class for managing menus and application flow.
 """
-import sys, os, inspect, datetime, json
+import sys, os, datetime, json
+from typing import Dict, Tuple
 from menu_system import Menu, MenuItemCmd
 from form_system import FormSystem
+
+# Example form shared by the form demo actions
+FORM_FILE = os.path.join(os.path.dirname(__file__), 'form_example.json')
+
+# Names of each app class's @MenuItemCmd methods, found once per class
+_MENU_COMMANDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _menu_command_names(cls: type) -> Tuple[str, ...]:
+    """Return the names of the decorated menu commands visible on a class.
+    
+    Scans the class __dict__ along the MRO, so commands inherited from a base
+    class or wrapped by another decorator (functools.wraps keeps _menu_meta)
+    are found too; a subclass override without @MenuItemCmd hides the base one.
+    """
+    names = _MENU_COMMANDS.get(cls)
+    if names is None:
+        attrs = {}
+        for klass in cls.__mro__:
+            for name, attr in vars(klass).items():
+                attrs.setdefault(name, attr)
+        names = tuple(name for name, attr in attrs.items()
+                      if getattr(attr, '_menu_meta', None) is not None)
+        _MENU_COMMANDS[cls] = names
+    return names
     
 class ConsoleApp:
     """Main console application with menu system."""
@@ -22,11 +48,8 @@ class ConsoleApp:
         """
         main_menu = self.main_menu
         
-        decorated_methods = []
-        members = inspect.getmembers(self, predicate=inspect.ismethod)
-        for name, method in members:
-            if hasattr(method, 'cmd'):  
-                decorated_methods.append(method)
+        # Bind the methods decorated with @MenuItemCmd on this class
+        decorated_methods = [getattr(self, name) for name in _menu_command_names(type(self))]
         
         # Load menu configuration from JSON file in this directory
         config_path = os.path.join(os.path.dirname(__file__), 'menu_config.json')
@@ -35,6 +58,11 @@ class ConsoleApp:
         main_menu.register(*decorated_methods, config_path=config_path)
 
     def run(self) -> None:
+        # Windows consoles line-buffer stdout, so every printed line becomes its
+        # own console write; the menu flushes explicitly once per frame instead
+        reconfigure = getattr(sys.stdout, 'reconfigure', None)
+        if os.name == 'nt' and reconfigure and sys.stdout.isatty():
+            reconfigure(line_buffering=False)
         self.main_menu.display()
 
     # Menu item action methods
@@ -238,14 +266,12 @@ class ConsoleApp:
         form_system = FormSystem(mode='interactive', handler=handler)
         
         # Load form from JSON file
-        form_file = os.path.join(os.path.dirname(__file__), 'form_example.json')
-        
-        if not os.path.exists(form_file):
-            print(f"\n❌ 表单文件未找到: {form_file}")
+        if not os.path.exists(FORM_FILE):
+            print(f"\n❌ 表单文件未找到: {FORM_FILE}")
             return True
         
         try:
-            form_data = form_system.load_form_from_file(form_file)
+            form_data = form_system.load_form_from_file(FORM_FILE)
             form_definition = form_data.get('form', {})
             
             # Process the form - callbacks will be triggered for each field
@@ -270,14 +296,12 @@ class ConsoleApp:
         form_system = FormSystem(mode='submit', endpoint=None)
         
         # Load form from JSON file
-        form_file = os.path.join(os.path.dirname(__file__), 'form_example.json')
-        
-        if not os.path.exists(form_file):
-            print(f"\n❌ 表单文件未找到: {form_file}")
+        if not os.path.exists(FORM_FILE):
+            print(f"\n❌ 表单文件未找到: {FORM_FILE}")
             return True
         
         try:
-            form_data = form_system.load_form_from_file(form_file)
+            form_data = form_system.load_form_from_file(FORM_FILE)
             form_definition = form_data.get('form', {})
             
             # Process the form - results will be automatically submitted at the end
@@ -312,14 +336,12 @@ class ConsoleApp:
         )
         
         # Load form from JSON file
-        form_file = os.path.join(os.path.dirname(__file__), 'form_example.json')
-        
-        if not os.path.exists(form_file):
-            print(f"\n❌ 表单文件未找到: {form_file}")
+        if not os.path.exists(FORM_FILE):
+            print(f"\n❌ 表单文件未找到: {FORM_FILE}")
             return True
         
         try:
-            form_data = form_system.load_form_from_file(form_file)
+            form_data = form_system.load_form_from_file(FORM_FILE)
             form_definition = form_data.get('form', {})
             
             # Process the form with pre-validation and post-processing
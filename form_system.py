@@ -8,26 +8,38 @@ Supports unified field handler pattern:
 """
 import json
 import os
+import re
 import sys
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Callable
 from menu_system import Menu
-from input_handler import read_key
+from input_handler import RawTerminal, read_key
 from ansi_manager import get_ansi_scheme
 
+try:
+    import unicodedata
+    HAS_UNICODEDATA = True
+except ImportError:
+    HAS_UNICODEDATA = False
+
 
 class FormField:
     """Represents a single form field."""
-    
+
+    __slots__ = ('id', 'type', 'label', 'description', 'placeholder',
+                 'required', 'options', 'validation', 'default', 'value')
+
     def __init__(self, field_data: Dict[str, Any]):
-        self.id = field_data.get('id', '')
-        self.type = field_data.get('type', 'text')  # text, single_choice, multi_choice
-        self.label = field_data.get('label', '')
-        self.description = field_data.get('description', '')
-        self.placeholder = field_data.get('placeholder', '')
-        self.required = field_data.get('required', False)
-        self.options = field_data.get('options', [])
-        self.validation = field_data.get('validation', {})
-        self.default = field_data.get('default', None)
+        get = field_data.get
+        self.id = get('id', '')
+        self.type = get('type', 'text')  # text, single_choice, multi_choice
+        self.label = get('label', '')
+        self.description = get('description', '')
+        self.placeholder = get('placeholder', '')
+        self.required = get('required', False)
+        self.options = get('options', [])
+        self.validation = get('validation', {})
+        self.default = get('default', None)
         self.value = None
 
 
@@ -82,7 +94,6 @@ class FormSystem:
                 return False, f"Maximum length is {validation['maxLength']} characters"
             
             if 'pattern' in validation:
-                import re
                 if not re.match(validation['pattern'], value):
                     return False, validation.get('errorMessage', 'Invalid format')
         
@@ -243,54 +254,50 @@ class FormSystem:
 
                 ansi = get_ansi_scheme()
 
-                while True:
-                    # Determine whether to show options based on flag
-                    if show_options:                        
-                        # Display options
-                        print()
-                        for i, option in enumerate(field.options):
-                            sys.stdout.write(ansi.get_screen('clear_line'))  # Clear entire line
-                            if i == selected_idx:
-                                # Highlight selected option
-                                print(f"  ● {option['label']}")
-                            else:
-                                print(f"    {option['label']}")
+                last_idx = len(field.options) - 1
+                with RawTerminal():
+                    while True:
+                        # Determine whether to show options based on flag
+                        if show_options:                        
+                            # Display options
+                            print()
+                            for i, option in enumerate(field.options):
+                                sys.stdout.write(ansi.get_screen('clear_line'))  # Clear entire line
+                                if i == selected_idx:
+                                    # Highlight selected option
+                                    print(f"  ● {option['label']}")
+                                else:
+                                    print(f"    {option['label']}")
                     
-                    # Reset flag and wait for key handling to determine whether to redisplay
-                    show_options = False
+                        # Reset flag and wait for key handling to determine whether to redisplay
+                        show_options = False
                     
-                    # Get user input
-                    key = self._get_key()
-                    ansi = get_ansi_scheme()
+                        # Get user input
+                        key = read_key()
+                        ansi = get_ansi_scheme()
                     
-                    if key == 'up':
-                        selected_idx = (selected_idx - 1) % len(field.options)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 1))                        
-                        show_options = True  # Need to redisplay options
-                    elif key == 'down':
-                        selected_idx = (selected_idx + 1) % len(field.options)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 1))
-                        show_options = True  # Need to redisplay options
-                    elif key == 'left' or key == 'right':
-                        # Treat left/right like up/down for single select
-                        if key == 'left':
-                            selected_idx = (selected_idx - 1) % len(field.options)
-                        else:  # key == 'right'
-                            selected_idx = (selected_idx + 1) % len(field.options)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 1))
-                        show_options = True  # Need to redisplay options
-                    elif key == 'enter':
-                        selected_value = field.options[selected_idx]['value']
-                        selected_label = field.options[selected_idx]['label']                        
-                        self._clear_lines(lines_printed)                        
-                        print(f"[{field_num}/{total_fields}] {field.label}: {selected_label}")
-                        return selected_value
-                    elif key == 'esc':
-                        print("⊘ Cancelled")                                         
-                        self._clear_lines(lines_printed)  
-                        return None
-                    # For invalid keys (like 'space', 'unknown', etc), show_options remains False
-                    # Next loop iteration won't redisplay options
+                        if key in ('up', 'down', 'left', 'right'):
+                            # Treat left/right like up/down for single select; with a
+                            # single option the highlight cannot move, so skip the redraw
+                            if last_idx:
+                                if key == 'up' or key == 'left':
+                                    selected_idx = last_idx if selected_idx == 0 else selected_idx - 1
+                                else:
+                                    selected_idx = 0 if selected_idx == last_idx else selected_idx + 1
+                                sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 1))
+                                show_options = True  # Need to redisplay options
+                        elif key == 'enter':
+                            selected_value = field.options[selected_idx]['value']
+                            selected_label = field.options[selected_idx]['label']                        
+                            self._clear_lines(lines_printed)                        
+                            print(f"[{field_num}/{total_fields}] {field.label}: {selected_label}")
+                            return selected_value
+                        elif key == 'esc':
+                            print("⊘ Cancelled")                                         
+                            self._clear_lines(lines_printed)  
+                            return None
+                        # For invalid keys (like 'space', 'unknown', etc), show_options remains False
+                        # Next loop iteration won't redisplay options
             except KeyboardInterrupt:
                 raise
         finally:
@@ -341,89 +348,77 @@ class FormSystem:
                 
                 show_options = True  # Flag to show options
                 ansi = get_ansi_scheme()
-                while True:
-                    # Determine whether to show options based on flag
-                    if show_options:
-                        # Display options
-                        print()
-                        for i, option in enumerate(field.options):
-                            checkbox = "[•]" if i in selected_indices else "[ ]"
-                            sys.stdout.write(ansi.get_screen('clear_line'))  # Clear entire line
-                            if i == current_idx:
-                                # Highlight current option
-                                print(f"  ► {checkbox} {option['label']}")
-                            else:
-                                print(f"    {checkbox} {option['label']}")
+                last_idx = len(field.options) - 1
+                with RawTerminal():
+                    while True:
+                        # Determine whether to show options based on flag
+                        if show_options:
+                            # Display options
+                            print()
+                            for i, option in enumerate(field.options):
+                                checkbox = "[•]" if i in selected_indices else "[ ]"
+                                sys.stdout.write(ansi.get_screen('clear_line'))  # Clear entire line
+                                if i == current_idx:
+                                    # Highlight current option
+                                    print(f"  ► {checkbox} {option['label']}")
+                                else:
+                                    print(f"    {checkbox} {option['label']}")
                         
-                        # Show selected count
-                        selected_count = len(selected_indices)
-                        print(f"\n  Selected: {selected_count} items")
+                            # Show selected count
+                            selected_count = len(selected_indices)
+                            print(f"\n  Selected: {selected_count} items")
                     
-                    # Reset flag and wait for key handling to determine whether to redisplay
-                    show_options = False
+                        # Reset flag and wait for key handling to determine whether to redisplay
+                        show_options = False
                     
-                    # Get user input
-                    key = self._get_key()
+                        # Get user input
+                        key = read_key()
 
-                    ansi = get_ansi_scheme()
+                        ansi = get_ansi_scheme()
                     
-                    if key == 'up':
-                        current_idx = (current_idx - 1) % len(field.options)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 3))                        
-                        show_options = True  # Need to redisplay options
-                    elif key == 'down':
-                        current_idx = (current_idx + 1) % len(field.options)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 3))
-                        show_options = True  # Need to redisplay options
-                    elif key == 'left' or key == 'right':
-                        # Treat left/right like up/down for multi-select navigation
-                        if key == 'left':
-                            current_idx = (current_idx - 1) % len(field.options)
-                        else:  # key == 'right'
-                            current_idx = (current_idx + 1) % len(field.options)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 3))
-                        show_options = True  # Need to redisplay options
-                    elif key == 'space':
-                        # Toggle selection
-                        if current_idx in selected_indices:
-                            selected_indices.remove(current_idx)
-                        else:
-                            selected_indices.add(current_idx)                        
-                        sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 3))
-                        show_options = True  # Need to redisplay options
-                    elif key == 'enter':
-                        selected_values = [field.options[i]['value'] for i in sorted(selected_indices)]
-                        selected_labels = [field.options[i]['label'] for i in sorted(selected_indices)]
+                        if key in ('up', 'down', 'left', 'right'):
+                            # Treat left/right like up/down for multi-select navigation; with a
+                            # single option the highlight cannot move, so skip the redraw
+                            if last_idx:
+                                if key == 'up' or key == 'left':
+                                    current_idx = last_idx if current_idx == 0 else current_idx - 1
+                                else:
+                                    current_idx = 0 if current_idx == last_idx else current_idx + 1
+                                sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 3))
+                                show_options = True  # Need to redisplay options
+                        elif key == 'space':
+                            # Toggle selection
+                            if current_idx in selected_indices:
+                                selected_indices.remove(current_idx)
+                            else:
+                                selected_indices.add(current_idx)                        
+                            sys.stdout.write(ansi.get_cursor_move('up', len(field.options) + 3))
+                            show_options = True  # Need to redisplay options
+                        elif key == 'enter':
+                            selected_values = [field.options[i]['value'] for i in sorted(selected_indices)]
+                            selected_labels = [field.options[i]['label'] for i in sorted(selected_indices)]
                                                 
-                        self._clear_lines(lines_printed)                        
-                        # Print the completed field in the desired format
-                        if selected_values:
-                            result_str = ', '.join(selected_labels)
-                            print(f"[{field_num}/{total_fields}] {field.label}: {result_str}")
-                        else:
-                            print(f"[{field_num}/{total_fields}] {field.label}: (no selection)")
+                            self._clear_lines(lines_printed)                        
+                            # Print the completed field in the desired format
+                            if selected_values:
+                                result_str = ', '.join(selected_labels)
+                                print(f"[{field_num}/{total_fields}] {field.label}: {result_str}")
+                            else:
+                                print(f"[{field_num}/{total_fields}] {field.label}: (no selection)")
                         
-                        return selected_values if selected_values else []
-                    elif key == 'esc':
-                        print("⊘ Cancelled")
-                        # Clear all lines for this field           
-                        self._clear_lines(lines_printed)             
-                        return None
-                    # 对于无效按键（包括 'unknown' 等），show_options 保持 False
-                    # 这样下次循环就不会重新显示选项
+                            return selected_values if selected_values else []
+                        elif key == 'esc':
+                            print("⊘ Cancelled")
+                            # Clear all lines for this field           
+                            self._clear_lines(lines_printed)             
+                            return None
+                        # 对于无效按键（包括 'unknown' 等），show_options 保持 False
+                        # 这样下次循环就不会重新显示选项
             except KeyboardInterrupt:
                 raise
         finally:
             self._show_cursor()
     
-    def _get_key(self) -> str:
-        """Get key input from user (Windows/Unix compatible).
-        
-        Uses centralized input_handler for consistency across the application.
-        Returns: 'up', 'down', 'left', 'right', 'enter', 'space', 'esc', 'char:{ch}', 'unknown'
-        """
-        return read_key()
-    
     def _clear_lines(self, num_lines: int) -> None:
         """Clear previous lines from console."""        
         for _ in range(num_lines):
@@ -447,10 +442,9 @@ class FormSystem:
             return None
         
         # Check for before_input_<field_id>
-        before_input_name = f'before_input_{field.id}'
+        callback_method = getattr(self.handler, f'before_input_{field.id}', None)
         
-        if hasattr(self.handler, before_input_name):
-            callback_method = getattr(self.handler, before_input_name)
+        if callback_method is not None:
             try:
                 result = callback_method(field, self.results)
                 return result
@@ -578,11 +572,12 @@ class FormSystem:
         }
         
         fields_map = {f['id']: f for f in form_data.get('fields', [])}
+        data = output['data']
         
         for field_id, value in results.items():
-            if field_id in fields_map:
-                field_info = fields_map[field_id]
-                output['data'][field_id] = {
+            field_info = fields_map.get(field_id)
+            if field_info is not None:
+                data[field_id] = {
                     'label': field_info.get('label', ''),
                     'type': field_info.get('type', ''),
                     'value': value
@@ -596,7 +591,6 @@ class FormSystem:
     
     def _get_timestamp(self) -> str:
         """Get current timestamp."""
-        from datetime import datetime
         return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     def _invoke_field_handler(self, field_id: str, field_value: Any, field: FormField) -> None:
@@ -615,10 +609,9 @@ class FormSystem:
             return
         
         # Invoke after_input_<field_id>
-        after_input_name = f'after_input_{field_id}'
+        callback_method = getattr(self.handler, f'after_input_{field_id}', None)
         
-        if hasattr(self.handler, after_input_name):
-            callback_method = getattr(self.handler, after_input_name)
+        if callback_method is not None:
             try:
                 callback_method(field_value, field, self.results)
                 print(f"✓ Field '{field_id}' processed successfully")
@@ -661,8 +654,10 @@ class FormSystem:
     
     def save_results(self, results: Dict[str, Any], file_path: str) -> None:
         """Save results to JSON file."""
+        # Encode up front so the file is written in one call rather than per chunk
+        payload = json.dumps(results, ensure_ascii=False, indent=2)
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write(payload)
         print(f"\n✓ Results saved to: {file_path}")
     
     def print_results(self, results: Dict[str, Any]) -> None:
@@ -672,27 +667,27 @@ class FormSystem:
         
         def get_display_width(text):
             """Calculate display width of text accounting for emojis and wide characters."""
-            # Import only if needed
-            try:
-                import unicodedata
-                # Calculate display width considering wide characters
-                display_width = 0
-                for char in text:
-                    if unicodedata.east_asian_width(char) in ('F', 'W'):  # Full-width or Wide
-                        display_width += 2
-                    elif unicodedata.category(char).startswith('C'):  # Control characters
-                        continue
-                    else:
-                        display_width += 1
-                return display_width
-            except ImportError:
+            # Printable ASCII is always one column per character
+            if text.isascii() and text.isprintable():
+                return len(text)
+            if not HAS_UNICODEDATA:
                 # Fallback to len if unicodedata is not available
                 return len(text)
+            # Calculate display width considering wide characters
+            display_width = 0
+            for char in text:
+                if unicodedata.east_asian_width(char) in ('F', 'W'):  # Full-width or Wide
+                    display_width += 2
+                elif unicodedata.category(char).startswith('C'):  # Control characters
+                    continue
+                else:
+                    display_width += 1
+            return display_width
         
         def pad_line(text, indent=2):
             """Pad text to fit within the border."""
             padding = width - get_display_width(text) - indent - 1
-            return text + (" " * max(0, padding))
+            return text.ljust(len(text) + padding)
         
         # Header
         print(f"\n┌{border_h}╮")
@@ -4,15 +4,10 @@ Provides consistent keyboard input handling across platforms and modules.
 """
 
 import os
+import select
 import sys
 from typing import Optional, Tuple
 
-try:    
-    import fcntl
-    HAS_FCNTL = True
-except ImportError:
-    HAS_FCNTL = False
-
 try:
     import msvcrt
     HAS_MSVCRT = True
@@ -27,6 +22,198 @@ except ImportError:
     HAS_TERMIOS = False
 
 
+def _enable_windows_vt_input() -> Optional[int]:
+    """Switch the Windows console on stdin into VT input mode.
+    
+    Returns:
+        The previous console mode, for _restore_windows_input_mode(), or None
+        if the console did not accept ENABLE_VIRTUAL_TERMINAL_INPUT
+    """
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-10)  # STD_INPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return None
+        # ENABLE_VIRTUAL_TERMINAL_INPUT
+        if not kernel32.SetConsoleMode(handle, mode.value | 0x0200):
+            return None
+        return mode.value
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+def _restore_windows_input_mode(mode: int) -> None:
+    """Put the Windows console on stdin back into a mode saved earlier."""
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetConsoleMode(kernel32.GetStdHandle(-10), mode)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+# How long to wait after ESC for the rest of an escape sequence (seconds)
+ESC_SEQUENCE_TIMEOUT = 0.05
+
+_ARROW_SEQUENCES = {
+    b'\x1b[A': 'up',
+    b'\x1b[B': 'down',
+    b'\x1b[C': 'right',
+    b'\x1b[D': 'left',
+}
+
+# Second half of a legacy (non-VT) Windows extended key, after '\xe0' or '\x00'
+_WINDOWS_EXTENDED_KEYS = {
+    'H': 'up',
+    'P': 'down',
+    'K': 'left',
+    'M': 'right',
+}
+
+# Single-byte keys with a name of their own
+_BYTE_KEYS = {
+    b'\r': 'enter',
+    b'\n': 'enter',
+    b' ': 'space',
+}
+
+# read_key() names -> read_key_as_tuple() results
+_KEY_TUPLES = {
+    'up': ('NAV', 'UP'),
+    'down': ('NAV', 'DOWN'),
+    'left': ('NAV', 'LEFT'),
+    'right': ('NAV', 'RIGHT'),
+    'enter': ('ENTER', None),
+    'space': ('SPACE', None),
+    'esc': ('ESC', None),
+}
+
+# Only ASCII digits count as menu shortcuts (str.isdigit also accepts '²', '٣', ...)
+_DIGITS = frozenset('0123456789')
+
+# Bytes read from the terminal but not yet returned as a key
+_pending = b''
+
+
+class RawTerminal:
+    """Keep stdin in raw mode across several read_key() calls.
+    
+    read_key() normally switches the terminal into raw mode and back for
+    every keypress. Inside ``with RawTerminal():`` that happens once for the
+    whole block. Output post-processing stays enabled, so printed newlines
+    still return the carriage. On Windows the block switches the console
+    into VT input mode instead and restores the saved mode on exit. Nested
+    use and non-tty stdin are no-ops. Do not call input() inside the block.
+    """
+    _active = False
+    
+    def __enter__(self) -> 'RawTerminal':
+        self._old_settings = None
+        self._old_console_mode = None
+        if HAS_MSVCRT and os.name == 'nt':
+            if not RawTerminal._active:
+                self._old_console_mode = _enable_windows_vt_input()
+                RawTerminal._active = self._old_console_mode is not None
+        elif HAS_TERMIOS and not RawTerminal._active and sys.stdin.isatty():
+            fd = sys.stdin.fileno()
+            self._old_settings = termios.tcgetattr(fd)
+            tty.setraw(fd)
+            attrs = termios.tcgetattr(fd)
+            attrs[1] |= termios.OPOST
+            termios.tcsetattr(fd, termios.TCSADRAIN, attrs)
+            RawTerminal._active = True
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        if self._old_settings is not None:
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self._old_settings)
+            RawTerminal._active = False
+        elif self._old_console_mode is not None:
+            _restore_windows_input_mode(self._old_console_mode)
+            RawTerminal._active = False
+
+
+def _read_key_raw(fd: int) -> str:
+    """Decode one keypress from a terminal that is already in raw mode.
+    
+    Args:
+        fd: File descriptor of the terminal
+    
+    Returns:
+        Standardized key string, as returned by read_key()
+    
+    Raises:
+        KeyboardInterrupt: When Ctrl+C is pressed
+    """
+    global _pending
+    
+    # Pull the whole burst in one syscall; keys left over from a burst
+    # (fast typing, key repeat) are kept for the next call
+    buf = _pending or os.read(fd, 8)
+    if buf[:1] == b'\x1b' and len(buf) < 3:
+        # Arrow keys arrive as one burst ('\x1b[A'), though a long burst can
+        # split one across reads; a bare ESC press has nothing queued behind
+        # it, so poll instead of toggling O_NONBLOCK
+        if select.select([fd], [], [], ESC_SEQUENCE_TIMEOUT)[0]:
+            buf += os.read(fd, 8)
+    
+    ch = buf[:1]
+    if ch == b'\x03':  # Ctrl+C
+        _pending = b''
+        raise KeyboardInterrupt()
+    
+    if ch == b'\x1b':  # Escape sequence
+        key = _ARROW_SEQUENCES.get(buf[:3])
+        if key:
+            _pending = buf[3:]
+            return key
+        # Bare ESC or a sequence we don't handle: drop the rest of it
+        _pending = b''
+        return 'esc'
+    
+    # Take the continuation bytes of a multi-byte UTF-8 character too
+    lead = buf[0]
+    size = 1 if lead < 0xC0 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    if len(buf) < size:
+        buf += os.read(fd, size - len(buf))
+    ch = buf[:size]
+    _pending = buf[size:]
+    
+    return _BYTE_KEYS.get(ch) or f'char:{ch.decode(errors="ignore")}'
+
+
+def _read_key_windows() -> str:
+    """Decode one keypress from the Windows console via msvcrt.
+    
+    Inside a RawTerminal block (VT input enabled) arrows arrive as the same
+    '\x1b[A' sequences the POSIX path parses; otherwise the console sends a
+    '\xe0' prefix and a second character.
+    
+    Returns:
+        Standardized key string, as returned by read_key()
+    
+    Raises:
+        KeyboardInterrupt: When Ctrl+C is pressed
+    """
+    ch = msvcrt.getwch()
+    
+    if ch == '\x03':  # Ctrl+C
+        raise KeyboardInterrupt()
+    
+    if ch == '\x1b':
+        # The rest of a VT sequence is already queued; a bare ESC is not followed by anything
+        seq = ch
+        while len(seq) < 3 and msvcrt.kbhit():
+            seq += msvcrt.getwch()
+        return _ARROW_SEQUENCES.get(seq.encode(), 'esc')
+    
+    if ch in ('\xe0', '\x00'):  # Legacy extended key (arrow keys, etc.)
+        return _WINDOWS_EXTENDED_KEYS.get(msvcrt.getwch(), 'unknown')
+    
+    return _BYTE_KEYS.get(ch.encode()) or f'char:{ch}'
+
+
 def read_key() -> str:
     """
     Read a single keypress from user input (cross-platform).
@@ -40,89 +227,24 @@ def read_key() -> str:
     Raises:
         KeyboardInterrupt: When Ctrl+C is pressed
     """
-    # Windows arrow-key handling via msvcrt
+    # Whatever was printed before waiting for a key must be visible, even
+    # when stdout is not line-buffered
+    sys.stdout.flush()
+    
+    # Windows key handling via msvcrt
     if HAS_MSVCRT and os.name == 'nt':
-        ch = msvcrt.getch()
-        
-        if ch == b'\x03':  # Ctrl+C
-            raise KeyboardInterrupt()
-        
-        if ch == b'\xe0':  # Extended key (arrow keys, etc.)
-            ch2 = msvcrt.getch()
-            if ch2 == b'H':  # Up arrow
-                return 'up'
-            elif ch2 == b'P':  # Down arrow
-                return 'down'
-            elif ch2 == b'K':  # Left arrow
-                return 'left'
-            elif ch2 == b'M':  # Right arrow
-                return 'right'
-            return 'unknown'
-        elif ch == b'\r':  # Enter
-            return 'enter'
-        elif ch == b' ':  # Space
-            return 'space'
-        elif ch == b'\x1b':  # Escape
-            return 'esc'
-        else:
-            return f'char:{ch.decode(errors="ignore")}'
+        return _read_key_windows()
     
     # POSIX raw terminal handling
     elif HAS_TERMIOS and sys.stdin.isatty():
         fd = sys.stdin.fileno()
+        if RawTerminal._active:
+            return _read_key_raw(fd)
         old_settings = termios.tcgetattr(fd)
-        old_flags = fcntl.fcntl(fd, fcntl.F_GETFL)
         try:
             tty.setraw(fd)
-            # First character - read immediately
-            ch = sys.stdin.read(1)
-            
-            if ch == '\x03':  # Ctrl+C
-                raise KeyboardInterrupt()
-            
-            if ch == '\x1b':  # Escape sequence - try to read more without blocking
-                # Temporarily set non-blocking mode
-                fcntl.fcntl(fd, fcntl.F_SETFL, old_flags | os.O_NONBLOCK)
-                try:
-                    next1 = sys.stdin.read(1)
-                except BlockingIOError:
-                    next1 = ''
-                finally:
-                    fcntl.fcntl(fd, fcntl.F_SETFL, old_flags)  # Restore blocking mode
-                
-                if not next1:
-                    # No follow-up char = bare ESC press
-                    return 'esc'
-                
-                if next1 == '[':
-                    # Try to read arrow key indicator
-                    fcntl.fcntl(fd, fcntl.F_SETFL, old_flags | os.O_NONBLOCK)
-                    try:
-                        next2 = sys.stdin.read(1)
-                    except BlockingIOError:
-                        next2 = ''
-                    finally:
-                        fcntl.fcntl(fd, fcntl.F_SETFL, old_flags)
-                    
-                    if next2 == 'A':
-                        return 'up'
-                    if next2 == 'B':
-                        return 'down'
-                    if next2 == 'C':
-                        return 'right'
-                    if next2 == 'D':
-                        return 'left'
-                
-                # Not an arrow key, just ESC
-                return 'esc'
-            
-            if ch in ('\r', '\n'):
-                return 'enter'
-            if ch == ' ':
-                return 'space'
-            return f'char:{ch}'
+            return _read_key_raw(fd)
         finally:
-            fcntl.fcntl(fd, fcntl.F_SETFL, old_flags)  # Restore original flags
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     
     else:
@@ -133,6 +255,24 @@ def read_key() -> str:
         return f'char:{inp[0]}'
 
 
+def key_pending() -> bool:
+    """Check whether another keypress is already waiting to be read.
+    
+    Lets key loops drain a burst (e.g. a held-down arrow key) before
+    redrawing. Always False for non-tty input.
+    
+    Returns:
+        True if read_key() would return without blocking
+    """
+    if _pending:
+        return True
+    if HAS_MSVCRT and os.name == 'nt':
+        return bool(msvcrt.kbhit())
+    if HAS_TERMIOS and sys.stdin.isatty():
+        return bool(select.select([sys.stdin.fileno()], [], [], 0)[0])
+    return False
+
+
 def read_key_as_tuple() -> Optional[Tuple[str, Optional[str]]]:
     """
     Read a single keypress and return as (kind, value) tuple.
@@ -156,22 +296,7 @@ def read_key_as_tuple() -> Optional[Tuple[str, Optional[str]]]:
     
     if key.startswith('char:'):
         ch = key[5:]
-        if ch.isdigit():
+        if ch in _DIGITS:
             return ('DIGIT', ch)
         return ('CHAR', ch)
-    elif key == 'up':
-        return ('NAV', 'UP')
-    elif key == 'down':
-        return ('NAV', 'DOWN')
-    elif key == 'left':
-        return ('NAV', 'LEFT')
-    elif key == 'right':
-        return ('NAV', 'RIGHT')
-    elif key == 'enter':
-        return ('ENTER', None)
-    elif key == 'space':
-        return ('SPACE', None)
-    elif key == 'esc':
-        return ('ESC', None)
-    else:
-        return None
+    return _KEY_TUPLES.get(key)
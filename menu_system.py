@@ -3,13 +3,139 @@ Multi-level Menu System for Console Applications
 A flexible and reusable menu framework supporting nested menus.
 """
 
-from typing import Callable, Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any, Union
+from collections import deque
+import codecs
 import os
+import re
 import sys
 import json
 from ansi_manager import get_ansi_scheme
-from input_handler import read_key_as_tuple
+from input_handler import RawTerminal, key_pending, read_key_as_tuple
 
+MENU_NAV_HINT = "[Use Arrow Keys ↑↓ to navigate, Enter to select]"
+# Row prefixes: an unselected row is indented to line up with the marker
+ITEM_PREFIX = "    "
+SELECTED_PREFIX = "  "
+SELECTED_MARKER = "➤ "
+# Multi-select checkbox, indexed by the item's selected state
+CHECKBOX_MARKS = ("[ ]", "[•]")
+# Rule drawn above and below menu and prompt titles
+HEADER_BAR = "=" * 60
+
+
+def _enable_windows_vt() -> bool:
+    """Switch the Windows console on stdout into VT (ANSI) processing mode.
+    
+    Returns:
+        True if the console accepted ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    """
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (ImportError, AttributeError, OSError):
+        return False
+
+
+def _detect_ansi_support() -> bool:
+    """Check whether stdout is a terminal that understands ANSI escapes."""
+    if not sys.stdout.isatty():
+        return False
+    if os.name == 'nt':
+        return _enable_windows_vt()
+    return os.environ.get('TERM', '') != 'dumb'
+
+
+# Whether stdout understands ANSI escapes; probed by the first _clear_screen()
+# so importing the module never touches the console mode
+_ansi_supported: Optional[bool] = None
+
+
+# Menu rows and headers are cached pre-encoded in this encoding; frames only
+# bypass sys.stdout when the terminal uses the same encoding
+FRAME_ENCODING = 'utf-8'
+MENU_NAV_HINT_BYTES = MENU_NAV_HINT.encode(FRAME_ENCODING)
+
+# Tokens of the options line: --name or a bare word, which ends at whitespace
+# or at the next --
+_OPTION_TOKEN_RE = re.compile(r'--(?P<flag>[^\s"]*)|(?P<bare>(?:(?!--)\S)+)')
+# A "quoted value" (closing quote optional); only matched where an option is
+# waiting for its value, anywhere else a quote is ordinary text
+_OPTION_QUOTED_RE = re.compile(r'[ \t]*"((?:\\.?|[^"\\])*)"?', re.S)
+# Escapes honoured inside quoted values: \" and \\ (other backslashes are kept)
+_OPTION_ESCAPE_RE = re.compile(r'\\([\\"])')
+
+# Menu config file contents: absolute path -> (mtime, text), see Menu.load_menu_config
+_CONFIG_CACHE: Dict[str, Tuple[float, str]] = {}
+
+# Stream _write_frame last looked at, and its fd when raw writes are safe
+_frame_stream = None
+_frame_fd: Optional[int] = None
+
+
+def _write_frame(frame: Union[str, bytes]) -> None:
+    """Write a block of menu output to the terminal in one call.
+    
+    On a POSIX terminal whose stdout encoding is FRAME_ENCODING the frame is
+    handed to os.write as bytes, skipping the TextIOWrapper/BufferedWriter
+    layers. On Windows (where console output must go through sys.stdout),
+    on terminals using another encoding (e.g. GBK), or when stdout is
+    redirected or replaced, it falls back to sys.stdout.write + flush so
+    the stream encodes the text itself.
+    
+    Args:
+        frame: Output to emit, including any ANSI control sequences; bytes
+            must be encoded with FRAME_ENCODING
+    """
+    global _frame_stream, _frame_fd
+    stream = sys.stdout
+    if stream is not _frame_stream:
+        _frame_stream = stream
+        _frame_fd = None
+        if os.name != 'nt':
+            try:
+                if (stream.isatty()
+                        and codecs.lookup(stream.encoding).name == FRAME_ENCODING):
+                    _frame_fd = stream.fileno()
+            except (AttributeError, TypeError, ValueError, LookupError, OSError):
+                pass
+    
+    if _frame_fd is None:
+        if isinstance(frame, bytes):
+            frame = frame.decode(FRAME_ENCODING)
+        stream.write(frame)
+        stream.flush()
+        return
+    
+    # Anything printed normally must reach the terminal first
+    stream.flush()
+    data = frame if isinstance(frame, bytes) else frame.encode(FRAME_ENCODING, errors='replace')
+    while data:
+        data = data[os.write(_frame_fd, data):]
+
+
+def _wait_for_enter(prompt: str) -> None:
+    """Show a pause prompt and wait for the user to press Enter.
+    
+    Reads the line straight from stdin instead of going through input(),
+    which sets up readline line editing that a bare pause never uses.
+    Skipped when stdin is not a terminal (piped or scripted runs), where
+    there is nobody to read the output first.
+    
+    Args:
+        prompt: Text written before waiting
+    """
+    if not sys.stdin.isatty():
+        return
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    sys.stdin.readline()
 
 
 class MenuItemCmd:
@@ -33,26 +159,37 @@ class MenuItemCmd:
         fn.cmd = self.cmd
         fn.params = self.params
         fn.options = self.options
+        # Everything register() needs, fetched with a single attribute lookup
+        fn._menu_meta = (self.cmd, self.params, self.options)
         return fn
 
 class MenuItem:
     """Represents a single menu item."""    
+    # One instance per row, so skip the per-instance __dict__
+    __slots__ = ('key', 'label', 'action', 'long_desc', 'params', 'options', 'submenu')
+    
     def __init__(self, label: str, action: Optional[Callable] = None, long_desc: Optional[str] = None, 
-                 params: Optional[List[Dict]] = None, options: Optional[List[Dict]] = None):
+                 params: Optional[List[Dict]] = None, options: Optional[List[Dict]] = None,
+                 key: Optional[str] = None):
+        self.key = key
         self.label = label
         self.action = action
         self.long_desc = long_desc
         self.params = params or []
         self.options = options or []
+        # The Menu this item opens, for entries added with add_submenu
+        self.submenu: Optional['Menu'] = None
     
     def execute(self, collected_params: Optional[Dict[str, Any]] = None, 
                 collected_options: Optional[Dict[str, Any]] = None) -> bool:
         if self.action is None:
             return True
         
-        # Default empty dicts if not provided
-        collected_params = collected_params or {}
-        collected_options = collected_options or {}
+        # Default empty dicts if not provided; a dict the caller passed is used as-is
+        if collected_params is None:
+            collected_params = {}
+        if collected_options is None:
+            collected_options = {}
         
         try:
             return self.action(collected_params, collected_options)
@@ -61,31 +198,101 @@ class MenuItem:
             return False
 
 
+def _register_menu_items(menu_list: List, current_menu: 'Menu', cmd_to_fn: Dict[str, Tuple]) -> None:
+    """Register items from a menu list, and its nested groups, into the specified menu.
+    
+    Args:
+        menu_list: List of menu items from JSON
+        current_menu: The Menu object to register items into
+        cmd_to_fn: Map of cmd -> (function, params, options) from Menu.register
+    """
+    # Groups still to fill, as (items, menu); walked with a FIFO queue instead of
+    # recursion so that lists merged into one submenu keep their config order
+    pending = deque([(menu_list, current_menu)])
+    get_entry = cmd_to_fn.get
+    while pending:
+        menu_list, current_menu = pending.popleft()
+        for item_config in menu_list:
+            get = item_config.get
+            cmd = get('cmd')
+            label = get('label', '')
+            icon = get('icon', '')
+            desc = get('desc', '')
+            subitems = get('items', [])
+            
+            if cmd:  # This is an action item
+                entry = get_entry(cmd)
+                if entry:
+                    fn, params, options = entry
+                    item_label = label or cmd
+                    current_menu.add_item(cmd, item_label, fn, icon, desc, params, options)
+            
+            elif label and subitems:  # This is a submenu
+                # Reuse the group if an earlier register() call created it,
+                # so plugins registering into the same group share one submenu
+                submenu = (current_menu.submenus or {}).get(label)
+                if submenu is None:
+                    # Create submenu - pass icon in icon param, not in label
+                    # add_submenu will handle adding icon to label
+                    submenu = current_menu.add_submenu(label, label + " >", icon, desc)
+                # Fill the submenu once this list is done; its row is already in place
+                pending.append((subitems, submenu))
+
 class Menu:
     """Represents a menu with multiple items and support for submenus."""    
     def __init__(self, title: str = "Menu", parent: Optional['Menu'] = None):
 
-        self.title = title
         self.parent = parent
         self.items: Dict[str, MenuItem] = {}
-        self.submenus: Dict[str, 'Menu'] = {}
-        self._item_order: List[str] = []
+        # Allocated on the first add_submenu; leaf menus never need one
+        self.submenus: Optional[Dict[str, 'Menu']] = None
+        self.title = title
+        # Items in display order; self.items indexes the same objects by key
+        self._entries: List[MenuItem] = []
+        # Pre-formatted rows (normal / highlighted); rebuilt each time
+        # _get_user_choice paints the menu, then reused for per-key redraws
+        self._rendered_normal: Optional[List[bytes]] = None
+        self._rendered_selected: Optional[List[bytes]] = None
+        # Per-row cursor moves and the full-redraw prelude, built with the rows
+        self._row_enter: List[bytes] = []
+        self._row_leave: List[bytes] = []
+        self._redraw_prefix = b''
+        # Row index -> item key (plus 'back'), built lazily on first paint
+        self._index_lookup: Optional[Tuple[str, ...]] = None
+    
+    @property
+    def title(self) -> str:
+        """Menu title as passed in; the header shows it upper-cased."""
+        return self._title
+    
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title = value
+        self._header = f"\n{HEADER_BAR}\n  {value.upper()}\n{HEADER_BAR}\n\n".encode(FRAME_ENCODING)
+        # Submenus show this title in their cached "Back to ..." row
+        for submenu in (self.submenus or {}).values():
+            submenu._rendered_normal = submenu._rendered_selected = None
     
     def _hide_cursor(self) -> None:
         """Hide the cursor using ANSI escape codes."""
         ansi = get_ansi_scheme()
-        sys.stdout.write(ansi.get_cursor('hide'))
-        sys.stdout.flush()
+        _write_frame(ansi.get_control_bytes('cursor', 'hide'))
     
     def _show_cursor(self) -> None:
         """Show the cursor using ANSI escape codes."""
         ansi = get_ansi_scheme()
-        sys.stdout.write(ansi.get_cursor('show'))
-        sys.stdout.flush()
+        _write_frame(ansi.get_control_bytes('cursor', 'show'))
     
     def _clear_screen(self) -> None:
         """Clear the console screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        global _ansi_supported
+        if _ansi_supported is None:
+            _ansi_supported = _detect_ansi_support()
+        clear = get_ansi_scheme().get_control_bytes('screen', 'clear_screen')
+        if _ansi_supported and clear:
+            _write_frame(clear)
+        else:
+            os.system('cls' if os.name == 'nt' else 'clear')
     
     def add_item(self, key: str, label: str, action: Callable, icon: Optional[str] = None, long_desc: Optional[str] = None,
                  params: Optional[List[Dict]] = None, options: Optional[List[Dict]] = None) -> None:
@@ -103,8 +310,10 @@ class Menu:
         """
         if icon:
             label = icon + " " + label
-        self.items[key] = MenuItem(label, action, long_desc, params, options)        
-        self._item_order.append(key)
+        item = MenuItem(label, action, long_desc, params, options, key=key)
+        self.items[key] = item
+        self._entries.append(item)
+        self._rendered_normal = self._rendered_selected = self._index_lookup = None
     
     def add_submenu(self, key: str, label: str, icon: Optional[str] = None, long_desc: Optional[str] = None) -> 'Menu':
         
@@ -112,9 +321,14 @@ class Menu:
             label = icon + " " + label
             
         submenu = Menu(title=label, parent=self)
+        if self.submenus is None:
+            self.submenus = {}
         self.submenus[key] = submenu
-        self.items[key] = MenuItem(label, None, long_desc)
-        self._item_order.append(key)
+        item = MenuItem(label, None, long_desc, key=key)
+        item.submenu = submenu
+        self.items[key] = item
+        self._entries.append(item)
+        self._rendered_normal = self._rendered_selected = self._index_lookup = None
         return submenu
     
     @staticmethod
@@ -125,23 +339,36 @@ class Menu:
             config_path: Path to menu_config.json. If None, searches in current directory.
         
         Returns:
-            Dictionary with 'menu' key containing hierarchical menu structure
+            Dictionary with 'menu' key containing hierarchical menu structure;
+            each call returns its own copy, so callers may modify it
         """
         if config_path is None:
             config_path = os.path.join(os.path.dirname(__file__), 'menu_config.json')
         
-        if not os.path.exists(config_path):
+        try:
+            mtime = os.stat(config_path).st_mtime
+        except OSError:
             return {'menu': []}
         
+        # Skip the disk read until the file changes; the text is parsed on
+        # every call, so each caller gets a dict of its own
+        path_key = os.path.abspath(config_path)
+        cached = _CONFIG_CACHE.get(path_key)
+        if cached is not None and cached[0] == mtime:
+            return json.loads(cached[1])
+        
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+                text = f.read()
+            config = json.loads(text)
+            _CONFIG_CACHE[path_key] = (mtime, text)
             return config
         except Exception as e:
             print(f"Warning: Failed to load menu config from {config_path}: {e}")
             return {'menu': []}
     
-    def register(self, *functions: Callable, allowed_groups: Dict = None, config_path: Optional[str] = None) -> None:
+    def register(self, *functions: Callable, allowed_groups: Dict = None, config_path: Optional[str] = None,
+                 menu_config: Optional[Dict] = None) -> None:
         """Register menu items from decorated functions with hierarchical JSON configuration.
         
         Menu structure is defined in JSON following the display order.
@@ -153,149 +380,182 @@ class Menu:
             functions: Functions decorated with @MenuItemCmd
             allowed_groups: (Deprecated) kept for backward compatibility
             config_path: Path to menu_config.json
+            menu_config: Already-parsed configuration; takes precedence over config_path
         """
-        # Load menu configuration from JSON
-        menu_config = self.load_menu_config(config_path)
+        # Load menu configuration from JSON unless the caller already has it
+        if menu_config is None:
+            menu_config = self.load_menu_config(config_path)
         menu_items = menu_config.get('menu', [])
         
-        # Build a map of cmd -> function for quick lookup
+        # Build a map of cmd -> (function, params, options) for quick lookup
         cmd_to_fn = {}
         for fn in functions:
-            if hasattr(fn, 'cmd'):
-                cmd_to_fn[fn.cmd] = fn
-        
-        # Recursively register menu items following JSON hierarchy
-        def register_menu_items(menu_list: List, current_menu: 'Menu') -> None:
-            """Recursively register items from menu list into the specified menu.
-            
-            Args:
-                menu_list: List of menu items from JSON
-                current_menu: The Menu object to register items into
-            """
-            for item_config in menu_list:
-                cmd = item_config.get('cmd')
-                label = item_config.get('label', '')
-                icon = item_config.get('icon', '')
-                desc = item_config.get('desc', '')
-                subitems = item_config.get('items', [])
-                
-                if cmd:  # This is an action item
-                    fn = cmd_to_fn.get(cmd)
-                    if fn:
-                        item_label = label or cmd
-                        # Get params and options from the function if available
-                        params = getattr(fn, 'params', None)
-                        options = getattr(fn, 'options', None)
-                        current_menu.add_item(cmd, item_label, fn, icon, desc, params, options)
-                
-                elif label and subitems:  # This is a submenu
-                    # Create submenu - pass icon in icon param, not in label
-                    # add_submenu will handle adding icon to label
-                    submenu = current_menu.add_submenu(label, label + " >", icon, desc)
-                    # Recursively register subitems
-                    register_menu_items(subitems, submenu)
+            meta = getattr(fn, '_menu_meta', None)
+            if meta is not None:
+                cmd, params, options = meta
+                cmd_to_fn[cmd] = (fn, params, options)
         
-        # Start registering from the top level
-        register_menu_items(menu_items, self)
+        # Register menu items following the JSON hierarchy
+        _register_menu_items(menu_items, self, cmd_to_fn)
     
-    def _redraw_menu_in_place(self, selected_idx: int = 0) -> None:
+    def _redraw_menu_in_place(self, selected_idx: int = 0, previous_idx: Optional[int] = None) -> None:
         """Redraw only the menu items in place.
         
+        When the previously selected index is known, only the two rows whose
+        highlight changed are rewritten; otherwise the whole list is redrawn.
+        
         Args:
             selected_idx: Index of the currently selected item
+            previous_idx: Index that was highlighted before this redraw
         """
-        ansi = get_ansi_scheme()
-        num_items = len(self._item_order)
-        # Count lines: items + back option (if parent) + instruction line
-        total_menu_lines = num_items + (1 if self.parent else 0) + 1
-        
-        # Move cursor up to the start of menu items (skip header)
-        sys.stdout.write(ansi.get_cursor_move('up', total_menu_lines))
-        sys.stdout.flush()
-        
-        # Clear from cursor to end of screen
-        sys.stdout.write(ansi.get_screen('clear_to_end'))
-        sys.stdout.flush()
-        
-        # Redraw menu items
-        self._display_items(selected_idx=selected_idx)
-        print("[Use Arrow Keys ↑↓ to navigate, Enter to select]")
+        if self._rendered_normal is None:
+            self._build_rendered_lines()
+        
+        if previous_idx is not None:
+            if previous_idx == selected_idx:
+                return
+            row_enter = self._row_enter
+            row_leave = self._row_leave
+            _write_frame(b''.join((
+                row_enter[previous_idx], self._rendered_normal[previous_idx], row_leave[previous_idx],
+                row_enter[selected_idx], self._rendered_selected[selected_idx], row_leave[selected_idx],
+            )))
+            return
+        
+        # Move up to the first item, clear to end of screen and redraw, all in one write
+        _write_frame(self._redraw_prefix + self._render_items(selected_idx, MENU_NAV_HINT_BYTES))
     
     def _display_header(self, clear: bool = True) -> None:
         """Display the menu header.
         
+        Not called by display(), which writes the header and items as one
+        frame; kept as a hook for subclasses that draw the parts separately.
+        
         Args:
             clear: Whether to clear the screen before displaying
         """
         if clear:
             self._clear_screen()
-        print("\n" + "=" * 60)
-        print(f"  {self.title.upper()}")
-        print("=" * 60 + "\n")
+        _write_frame(self._render_header())
     
-    def _display_items(self, selected_idx: int = 0) -> None:
-        """Display all menu items with optional highlighting.
+    def _render_header(self) -> bytes:
+        """Return the title block shown above the items.
         
-        Args:
-            selected_idx: Index of the currently selected item (0-based)
+        The block is built and encoded when the title is set, so this is just
+        a lookup.
+        
+        Returns:
+            The encoded header, ending with the blank line before the first item
         """
+        return self._header
+    
+    def _build_rendered_lines(self) -> None:
+        """Pre-format and encode every row, including the back option, in both states."""
         ansi = get_ansi_scheme()
-        num_items = len(self._item_order)
-        back_idx = num_items
         primary_code = ansi.get_theme_color('primary')
         secondary_code = ansi.get_theme_color('secondary')
         reset_code = ansi.get_reset()
-                
-        for idx, key in enumerate(self._item_order, 1):
-            label = self.items[key].label
-            long_desc = self.items[key].long_desc
-            
-            # Highlight selected item with description
-            if idx - 1 == selected_idx:
-                desc_text = ""
-                if long_desc:                                        
-                    desc_text = f" {secondary_code}({long_desc}){reset_code}"                                
-                print(f"  {primary_code}➤ {idx}. {label}{desc_text} {reset_code}")
-            else:
-                print(f"    {idx}. {label}")
         
-        # Show back option if there's a parent menu
+        rows = [(item.label, item.long_desc) for item in self._entries]
         if self.parent:
-            if back_idx == selected_idx:                
-                print(f"  {primary_code}➤ {num_items + 1}. Back to {self.parent.title} {reset_code}")
-            else:
-                print(f"    {num_items + 1}. Back to {self.parent.title}")
+            rows.append((f"Back to {self.parent.title}", None))
+        
+        normal = []
+        selected = []
+        for idx, (label, long_desc) in enumerate(rows, 1):
+            number = f"{idx}. "
+            normal.append((ITEM_PREFIX + number + label).encode(FRAME_ENCODING))
+            # Highlight selected item with description
+            desc_text = f" {secondary_code}({long_desc}){reset_code}" if long_desc else ""
+            selected.append("".join((SELECTED_PREFIX, primary_code, SELECTED_MARKER, number,
+                                     label, desc_text, " ", reset_code)).encode(FRAME_ENCODING))
+        self._rendered_normal = normal
+        self._rendered_selected = selected
+        
+        # Cursor moves for this menu's shape: the cursor rests on the line below
+        # the instruction line, so row idx sits (total_lines - idx) lines above it
+        total_lines = len(rows) + 1
+        clear_line = ansi.get_control_bytes('screen', 'clear_line')
+        self._row_enter = [(ansi.get_cursor_move('up', total_lines - idx) + '\r').encode(FRAME_ENCODING) + clear_line
+                           for idx in range(len(rows))]
+        self._row_leave = [(ansi.get_cursor_move('down', total_lines - idx) + '\r').encode(FRAME_ENCODING)
+                           for idx in range(len(rows))]
+        self._redraw_prefix = (ansi.get_cursor_move('up', total_lines).encode(FRAME_ENCODING)
+                               + ansi.get_control_bytes('screen', 'clear_to_end'))
+    
+    def _render_items(self, selected_idx: int = 0, footer: Optional[bytes] = None) -> bytes:
+        """Build the item block with the selected row highlighted.
+        
+        Args:
+            selected_idx: Index of the currently selected item (0-based)
+            footer: Optional encoded line appended after the items
+        
+        Returns:
+            The encoded rows joined by newlines, with a trailing newline
+            (empty if no rows)
+        """
+        if self._rendered_normal is None:
+            self._build_rendered_lines()
+        lines = list(self._rendered_normal)
+        if 0 <= selected_idx < len(lines):
+            lines[selected_idx] = self._rendered_selected[selected_idx]
+        if footer is not None:
+            lines.append(footer)
+        return b'\n'.join(lines) + b'\n' if lines else b''
+    
+    def _display_items(self, selected_idx: int = 0) -> None:
+        """Display all menu items with optional highlighting.
+        
+        Not called by display(), which writes the header and items as one
+        frame; kept as a hook for subclasses that draw the parts separately.
+        
+        Args:
+            selected_idx: Index of the currently selected item (0-based)
+        """
+        body = self._render_items(selected_idx)
+        if body:
+            _write_frame(body)
 
-    def _redraw_multi_select_in_place(self, items: List[dict], selected_idx: int) -> None:
-        """Redraw the multi-select list in place.
+    def _format_multi_select_row(self, item: dict, highlighted: bool) -> str:
+        """Format one multi-select row.
+        
+        Args:
+            item: {label, description, selected} dict
+            highlighted: Whether the row is under the cursor
+        
+        Returns:
+            The row without a trailing newline
+        """
+        row = "  " + CHECKBOX_MARKS[bool(item['selected'])] + " " + item['label']
+        if highlighted:
+            ansi = get_ansi_scheme()
+            return ansi.get_theme_color('primary') + row + ansi.get_reset()
+        return row
+    
+    def _redraw_multi_select_in_place(self, items: List[dict], selected_idx: int,
+                                      rows: Optional[Tuple[int, ...]] = None) -> None:
+        """Redraw multi-select rows in place.
         
         Args:
             items: List of {label, description, selected} dicts
             selected_idx: Current selected index
+            rows: Indices of the rows that changed; all rows if None
         """
         ansi = get_ansi_scheme()
-        # Move cursor up to start of list (items + instruction + blank = num_items + 2)
+        clear_line = ansi.get_screen('clear_line')
         num_items = len(items)
-        sys.stdout.write(ansi.get_cursor_move('up', num_items + 2))
-        
-        # Redraw all items
-        for idx, item in enumerate(items):
-            checkbox = "[•]" if item['selected'] else "[ ]"
-            highlight = ansi.get_theme_color('primary')            
-            reset = ansi.get_reset()
-
-            label = item['label']
-            
-            sys.stdout.write(ansi.get_screen('clear_line'))  # Clear entire line
-
-            if idx == selected_idx:
-                print(f"{highlight}  {checkbox} {label}{reset}")
-            else:
-                print(f"  {checkbox} {label}")
-                    
-        # Move down to instruction line
-        sys.stdout.write(ansi.get_cursor_move('down', num_items))
-        sys.stdout.flush()
+        if rows is None:
+            rows = range(num_items)
+        
+        # Row idx sits (num_items - idx + 2) lines above the cursor
+        # (below the list: a blank line, the instruction line, then the cursor)
+        parts = []
+        for idx in rows:
+            offset = num_items - idx + 2
+            parts.append(ansi.get_cursor_move('up', offset) + '\r' + clear_line
+                         + self._format_multi_select_row(items[idx], idx == selected_idx)
+                         + ansi.get_cursor_move('down', offset) + '\r')
+        _write_frame(''.join(parts))
     
     def multi_select_prompt(self, title: str, items: List[dict], allow_empty: bool = False) -> List[dict]:
         """Display a multi-select prompt with checkboxes.
@@ -313,67 +573,77 @@ class Menu:
         try:
             selected_idx = 0
             
-            # Display header
-            print("\n  " + title)
-            
-            # Display items
+            # Display header, items and instructions in one write
+            parts = ["\n  " + title + "\n"]
             for idx, item in enumerate(items):
-                checkbox = "[•]" if item['selected'] else "[ ]"
-                highlight = ansi.get_theme_color('primary') if idx == selected_idx else ""
-                reset = ansi.get_reset() if idx == selected_idx else ""
-                label = item['label']
-                
-                print(f"{highlight}  {checkbox} {label}{reset}")
+                parts.append(self._format_multi_select_row(item, idx == selected_idx) + "\n")
             
-            print("\n[Use Arrow Keys ↑↓ to navigate, SPACE to toggle, Enter to confirm]")
+            parts.append("\n[Use Arrow Keys ↑↓ to navigate, SPACE to toggle, Enter to confirm]\n")
+            _write_frame(''.join(parts))
             
-            while True:
-                try:
-                    key_info = read_key_as_tuple()
-                    if not key_info:
-                        continue
-                    kind, value = key_info
+            last_idx = len(items) - 1
+            # Row currently drawn highlighted; lags selected_idx during a key burst
+            shown_idx = selected_idx
+            with RawTerminal():
+                while True:
+                    # Redraw once queued keys (e.g. a held-down arrow) are drained
+                    if shown_idx != selected_idx and not key_pending():
+                        self._redraw_multi_select_in_place(items, selected_idx, (shown_idx, selected_idx))
+                        shown_idx = selected_idx
                     
-                    if kind == 'NAV':
-                        if value == 'UP':
-                            selected_idx = (selected_idx - 1) % len(items)
-                            self._redraw_multi_select_in_place(items, selected_idx)
-                        elif value == 'DOWN':
-                            selected_idx = (selected_idx + 1) % len(items)
-                            self._redraw_multi_select_in_place(items, selected_idx)
-                        continue
-                    if kind == 'SPACE':  # Space to toggle
-                        items[selected_idx]['selected'] = not items[selected_idx]['selected']
-                        self._redraw_multi_select_in_place(items, selected_idx)
-                        continue
-                    if kind == 'ENTER':
-                        return [item for item in items if item['selected']]
-                    if kind == 'ESC':
-                        return None
+                    try:
+                        key_info = read_key_as_tuple()
+                        if not key_info:
+                            continue
+                        kind, value = key_info
+                    
+                        if kind == 'NAV':
+                            if value == 'UP':
+                                selected_idx = last_idx if selected_idx == 0 else selected_idx - 1
+                            elif value == 'DOWN':
+                                selected_idx = 0 if selected_idx == last_idx else selected_idx + 1
+                            continue
+                        if kind == 'SPACE':  # Space to toggle
+                            items[selected_idx]['selected'] = not items[selected_idx]['selected']
+                            # Also repaints a highlight move still pending from a burst
+                            rows = (selected_idx,) if shown_idx == selected_idx else (shown_idx, selected_idx)
+                            self._redraw_multi_select_in_place(items, selected_idx, rows)
+                            shown_idx = selected_idx
+                            continue
+                        if kind == 'ENTER':
+                            return [item for item in items if item['selected']]
+                        if kind == 'ESC':
+                            return None
                         
-                except KeyboardInterrupt:
-                    raise
+                    except KeyboardInterrupt:
+                        raise
         finally:
             self._show_cursor()
     
-    def _redraw_yes_no_in_place(self, selected: int, yes_text: str = "YES", no_text: str = "NO") -> None:
+    def _redraw_yes_no_in_place(self, selected: int, yes_text: str = "YES", no_text: str = "NO",
+                                previous: Optional[int] = None) -> None:
         """Redraw only the yes/no selection line in place.
         
         Args:
             selected: 0 for YES, 1 for NO
             yes_text: Custom text for YES option (default: "YES")
             no_text: Custom text for NO option (default: "NO")
+            previous: Selection currently on screen; nothing is written if unchanged
         """
+        if selected == previous:
+            return
         ansi = get_ansi_scheme()
-        yes_option = f"{ansi.get_theme_color('primary')}➤ {yes_text}{ansi.get_reset()}" if selected == 0 else f"  {yes_text}"
-        no_option = f"{ansi.get_theme_color('primary')}➤ {no_text}{ansi.get_reset()}" if selected == 1 else f"  {no_text}"
-        # Move cursor up 3 lines to YES/NO line, clear it, and reprint
-        sys.stdout.write(ansi.get_cursor_move('up', 3))  # Move up 3 lines
-        sys.stdout.write(ansi.get_screen('clear_line'))  # Clear the line
-        sys.stdout.write('\r')       # Return to start of line
-        sys.stdout.write(f"  {yes_option} / {no_option}\n")
-        sys.stdout.write(ansi.get_cursor_move('down', 3))  # Move down 3 lines back to input position
-        sys.stdout.flush()
+        primary_code = ansi.get_theme_color('primary')
+        reset_code = ansi.get_reset()
+        yes_option = f"{primary_code}➤ {yes_text}{reset_code}" if selected == 0 else f"  {yes_text}"
+        no_option = f"{primary_code}➤ {no_text}{reset_code}" if selected == 1 else f"  {no_text}"
+        # The YES/NO line sits 3 lines above the cursor (blank line and hint
+        # below it): move up, clear it, reprint it from column 0 and move back
+        # down past the other 2 lines, in a single write
+        _write_frame(ansi.get_cursor_move('up', 3).encode(FRAME_ENCODING)
+                     + ansi.get_control_bytes('screen', 'clear_line')
+                     + f"\r  {yes_option} / {no_option}\n".encode(FRAME_ENCODING)
+                     + ansi.get_cursor_move('down', 2).encode(FRAME_ENCODING))
     
     def yes_no_prompt(self, question: str = "Do you want to continue?", description: str = "", yes_text: str = "YES", no_text: str = "NO") -> bool:
         """Display a yes/no prompt with left/right arrow key selection.
@@ -392,49 +662,37 @@ class Menu:
         try:
             selected = 0  # 0 = Yes, 1 = No
             
-            # Display header once
-            print("\n" + "=" * 60)
-            print(f"  {question}")
-            print("=" * 60)
-            if description:
-                print(f"\n{description}")
-            print()
+            # Display header, options and instructions once, in a single write;
+            # later changes update the options line in place
+            desc_text = f"\n{description}\n" if description else ""
+            yes_option = f"{ansi.get_theme_color('primary')}➤ {yes_text}{ansi.get_reset()}"
+            no_option = f"  {no_text}"
+            _write_frame(f"\n{HEADER_BAR}\n  {question}\n{HEADER_BAR}\n{desc_text}\n"
+                         f"  {yes_option} / {no_option}\n"
+                         "\n[Use Arrow Keys ← → to select, Enter to confirm]\n")
             
-            first_time = True
-            
-            while True:
-                # Display yes/no (first time normally, then update in place)
-                if first_time:
-                    yes_option = f"{ansi.get_theme_color('primary')}➤ {yes_text}{ansi.get_reset()}" if selected == 0 else f"  {yes_text}"
-                    no_option = f"{ansi.get_theme_color('primary')}➤ {no_text}{ansi.get_reset()}" if selected == 1 else f"  {no_text}"
-                    print(f"  {yes_option} / {no_option}")
-                    print("\n[Use Arrow Keys ← → to select, Enter to confirm]")
-                    first_time = False
-                
-                # Get input
-                try:
-                    key_info = read_key_as_tuple()
-                    if not key_info:
-                        continue
-                    kind, value = key_info
+            with RawTerminal():
+                while True:
+                    # Get input
+                    try:
+                        key_info = read_key_as_tuple()
+                        if not key_info:
+                            continue
+                        kind, value = key_info
                     
-                    if kind == 'NAV':
-                        if value == 'LEFT':
-                            if selected != 0:
-                                selected = 0
-                                self._redraw_yes_no_in_place(selected, yes_text, no_text)
-                        elif value == 'RIGHT':
-                            if selected != 1:
-                                selected = 1
-                                self._redraw_yes_no_in_place(selected, yes_text, no_text)
-                        continue
-                    if kind == 'ENTER':
-                        return selected == 0
-                    if kind == 'ESC':
-                        return None
+                        if kind == 'NAV':
+                            if value in ('LEFT', 'RIGHT'):
+                                previous = selected
+                                selected = 0 if value == 'LEFT' else 1
+                                self._redraw_yes_no_in_place(selected, yes_text, no_text, previous)
+                            continue
+                        if kind == 'ENTER':
+                            return selected == 0
+                        if kind == 'ESC':
+                            return None
                         
-                except KeyboardInterrupt:
-                    raise
+                    except KeyboardInterrupt:
+                        raise
         finally:
             self._show_cursor()
     
@@ -448,63 +706,74 @@ class Menu:
         Returns:
             The key of selected item or None if invalid
         """
-        num_items = len(self._item_order)
-        max_idx = num_items + (1 if self.parent else 0)
+        # Row index -> key (plus 'back'); fixed while this menu is on screen
+        lookup = self._get_index_lookup()
+        max_idx = len(lookup)
+        last_idx = max_idx - 1
         selected_idx = 0
         
         # Initial display
-        #if clear_initial:
-        #    os.system('cls' if os.name == 'nt' else 'clear')
-        self._display_header(clear=False)
-        self._display_items(selected_idx=selected_idx)
-        print("[Use Arrow Keys ↑↓ to navigate, Enter to select]")
+        # Rebuild the rows so label edits made by actions and a switched
+        # colour scheme show up; redraws within this session reuse them
+        self._build_rendered_lines()
+        # Header, items and hint go out in a single write
+        _write_frame(self._render_header() + self._render_items(selected_idx, MENU_NAV_HINT_BYTES))
         
-        while True:
-            # Get input
-            try:
-                key_info = read_key_as_tuple()
-                if not key_info:
-                    continue
-                kind, value = key_info
+        # Row currently drawn highlighted; lags selected_idx during a key burst
+        shown_idx = selected_idx
+        
+        # Stay in raw mode for the whole navigation loop instead of per key
+        with RawTerminal():
+            while True:
+                # Redraw once queued keys (e.g. a held-down arrow) are drained
+                if shown_idx != selected_idx and not key_pending():
+                    self._redraw_menu_in_place(selected_idx, shown_idx)
+                    shown_idx = selected_idx
+                
+                # Get input
+                try:
+                    key_info = read_key_as_tuple()
+                    if not key_info:
+                        continue
+                    kind, value = key_info
                 
-                if kind == 'NAV':
-                    if value == 'UP':
-                        selected_idx = (selected_idx - 1) % max_idx
-                    elif value == 'DOWN':
-                        selected_idx = (selected_idx + 1) % max_idx
-                    elif value == 'RIGHT':
-                        # For submenu items, RIGHT key acts like ENTER to enter the submenu
-                        key = self._index_to_key(selected_idx)
-                        if key and key in self.submenus:
-                            return key
-                    elif value == 'LEFT':
-                        # For submenu items, LEFT key acts like ESC to go back
+                    if kind == 'NAV':
+                        # Wrap around at either end
+                        if value == 'UP':
+                            selected_idx = last_idx if selected_idx == 0 else selected_idx - 1
+                        elif value == 'DOWN':
+                            selected_idx = 0 if selected_idx == last_idx else selected_idx + 1
+                        elif value == 'RIGHT':
+                            # For submenu items, RIGHT key acts like ENTER to enter the submenu
+                            entries = self._entries
+                            if selected_idx < len(entries) and entries[selected_idx].submenu is not None:
+                                return entries[selected_idx].key
+                        elif value == 'LEFT':
+                            # For submenu items, LEFT key acts like ESC to go back
+                            if self.parent:
+                                return 'back'
+                        continue
+                    if kind == 'ESC':
                         if self.parent:
                             return 'back'
-                    self._redraw_menu_in_place(selected_idx)
-                    continue
-                if kind == 'ESC':
-                    if self.parent:
-                        return 'back'
-                    else:
-                        raise KeyboardInterrupt()
-                if kind == 'ENTER':
-                    return self._index_to_key(selected_idx)
-                if kind == 'DIGIT':
-                    try:
-                        choice_num = int(value)
-                        if 1 <= choice_num <= num_items:
-                            return self._item_order[choice_num - 1]
-                        elif self.parent and choice_num == num_items + 1:
-                            return 'back'
-                    except ValueError:
-                        continue
+                        else:
+                            raise KeyboardInterrupt()
+                    if kind == 'ENTER':
+                        # Show the chosen row highlighted while its action runs
+                        self._redraw_menu_in_place(selected_idx, shown_idx)
+                        return lookup[selected_idx] if max_idx else None
+                    if kind == 'DIGIT':
+                        # Digits 1..max_idx pick an item, or the back option after the items
+                        choice_num = ord(value) - 0x30
+                        if 1 <= choice_num <= max_idx:
+                            return lookup[choice_num - 1]
                     
-            except KeyboardInterrupt:
-                # Re-raise to allow Ctrl+C to work
-                raise
-            except (ValueError, IndexError):
-                pass
+                except KeyboardInterrupt:
+                    # Re-raise to allow Ctrl+C to work
+                    raise
+                except (ValueError, IndexError):
+                    pass
+    
     
     def _index_to_key(self, idx: int) -> Optional[str]:
         """Convert selected index to menu key.
@@ -515,14 +784,18 @@ class Menu:
         Returns:
             Menu item key or None
         """
-        num_items = len(self._item_order)
-        
-        if 0 <= idx < num_items:
-            return self._item_order[idx]
-        elif self.parent and idx == num_items:
-            return 'back'
+        lookup = self._get_index_lookup()
+        return lookup[idx] if 0 <= idx < len(lookup) else None
+    
+    def _get_index_lookup(self) -> Tuple[str, ...]:
+        """Return the row index -> key table, building it on first use.
         
-        return None
+        Returns:
+            Item keys in display order, followed by 'back' for submenus
+        """
+        if self._index_lookup is None:
+            self._index_lookup = tuple(item.key for item in self._entries) + (('back',) if self.parent else ())
+        return self._index_lookup
     
     def _process_choice(self, choice: str) -> Optional[str]:
         """Process numeric choice input.
@@ -533,22 +806,22 @@ class Menu:
         Returns:
             Menu item key or None if invalid
         """
-        if self.parent and choice == str(len(self._item_order) + 1):
+        if self.parent and choice == str(len(self._entries) + 1):
             return 'back'
         
         try:
             choice_num = int(choice)
-            if 1 <= choice_num <= len(self._item_order):
-                return self._item_order[choice_num - 1]
+            if 1 <= choice_num <= len(self._entries):
+                return self._entries[choice_num - 1].key
             
-            max_choice = len(self._item_order) + (1 if self.parent else 0)
+            max_choice = len(self._entries) + (1 if self.parent else 0)
             print(f"\n⚠️  Invalid choice. Please enter a number between 1 and {max_choice}")
-            input("Press Enter to continue...")
+            _wait_for_enter("Press Enter to continue...")
             return None
             
         except (ValueError, IndexError):
             print("\n⚠️  Invalid input. Please enter a valid number.")
-            input("Press Enter to continue...")
+            _wait_for_enter("Press Enter to continue...")
             return None
     
     def _collect_parameters(self, params_config: List[Dict], options_config: List[Dict]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
@@ -667,100 +940,56 @@ class Menu:
         Returns:
             Dict of parsed option values (only includes explicitly provided options)
         """
-        import re
+        options_by_name = {opt.get('name', ''): opt for opt in options_config}
         
         # Start with empty result - only add options that user explicitly provides
         result = {}
+        # Option whose value the next token supplies, if any
+        pending = None
+        pos = 0
         
-        # Parse the input string with support for quoted values
-        i = 0
-        while i < len(input_str):
-            # Skip whitespace
-            while i < len(input_str) and input_str[i].isspace():
-                i += 1
-            
-            if i >= len(input_str):
-                break
-            
-            # Check if this is an option flag
-            if input_str[i:i+2] == '--':
-                # Extract option name
-                i += 2
-                key_start = i
-                while i < len(input_str) and input_str[i] not in ' \t\n"':
-                    i += 1
-                key = input_str[key_start:i]
-                
-                # Skip whitespace after key
-                while i < len(input_str) and input_str[i] in ' \t':
-                    i += 1
-                
-                # Find option config
-                option_config = None
-                for opt in options_config:
-                    if opt.get('name', '') == key:
-                        option_config = opt
-                        break
+        while True:
+            quoted = _OPTION_QUOTED_RE.match(input_str, pos) if pending else None
+            if quoted:
+                value = _OPTION_ESCAPE_RE.sub(r'\1', quoted.group(1))
+                pos = quoted.end()
+            else:
+                match = _OPTION_TOKEN_RE.search(input_str, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                flag, bare = match.group('flag', 'bare')
                 
-                if option_config:
-                    option_type = option_config.get('type', 'text')
-                    
-                    if option_type == 'bool':
+                if flag is not None:
+                    option_config = options_by_name.get(flag)
+                    pending = None
+                    if option_config is None:
+                        # Unknown option: its value (if any) is skipped below
+                        continue
+                    if option_config.get('type', 'text') == 'bool':
                         # Boolean flag - presence means True
-                        result[key] = True
-                    elif i < len(input_str) and input_str[i] != '-':
-                        # Get the value
-                        if input_str[i] == '"':
-                            # Quoted value - extract until closing quote, handle escapes
-                            i += 1
-                            value = []
-                            while i < len(input_str):
-                                if input_str[i] == '\\' and i + 1 < len(input_str):
-                                    # Escape sequence
-                                    next_char = input_str[i + 1]
-                                    if next_char == '"':
-                                        value.append('"')
-                                        i += 2
-                                    elif next_char == '\\':
-                                        value.append('\\')
-                                        i += 2
-                                    else:
-                                        # Unknown escape, keep the backslash
-                                        value.append(input_str[i])
-                                        i += 1
-                                elif input_str[i] == '"':
-                                    # End of quoted value
-                                    i += 1
-                                    break
-                                else:
-                                    value.append(input_str[i])
-                                    i += 1
-                            value = ''.join(value)
-                        else:
-                            # Unquoted value - extract until next space or --
-                            value_start = i
-                            while i < len(input_str) and not input_str[i].isspace() and input_str[i:i+2] != '--':
-                                i += 1
-                            value = input_str[value_start:i]
-                        
-                        # Type conversion
-                        if option_type == 'number':
-                            try:
-                                result[key] = float(value)
-                            except:
-                                result[key] = value
-                        else:
-                            result[key] = value
+                        result[flag] = True
                     else:
-                        # No value provided, skip
-                        pass
-                else:
-                    # Unknown option, skip to next --
-                    while i < len(input_str) and input_str[i:i+2] != '--':
-                        i += 1
+                        pending = (flag, option_config)
+                    continue
+                
+                if pending is None or bare.startswith('-'):
+                    # Not an option value (a value can't start with '-'), skip it
+                    pending = None
+                    continue
+                value = bare
+            
+            key, option_config = pending
+            pending = None
+            
+            # Type conversion
+            if option_config.get('type', 'text') == 'number':
+                try:
+                    result[key] = float(value)
+                except ValueError:
+                    result[key] = value
             else:
-                # Not an option flag, skip this character
-                i += 1
+                result[key] = value
         
         return result
     
@@ -806,14 +1035,15 @@ class Menu:
         if key == 'back':
             return False
         
+        menu_item = self.items.get(key)
+        
         # Check if it's a submenu
-        if key in self.submenus:
-            self.submenus[key].display(clear_first=False)
+        if menu_item is not None and menu_item.submenu is not None:
+            menu_item.submenu.display(clear_first=False)
             return True
         
         # Execute regular menu item
-        if key in self.items:
-            menu_item = self.items[key]
+        if menu_item is not None:
             collected_params = {}
             collected_options = {}
             
@@ -832,7 +1062,7 @@ class Menu:
             except Exception as e:
                 print(f"\n❌ Error executing action: {e}")
             
-            input("\nPress Enter to continue...")
+            _wait_for_enter("\nPress Enter to continue...")
             return True
         
         return True
@@ -843,18 +1073,26 @@ class Menu:
         Args:
             clear_first: Whether to clear screen on first display
         """
+        self._hide_cursor()  # Hide cursor during menu navigation
         try:
             while True:
-                self._hide_cursor()  # Hide cursor during menu navigation
                 choice = self._get_user_choice(clear_initial=clear_first)
-                self._show_cursor()  # Show cursor before executing choice
                 
                 if choice is None:
                     continue
                 
+                # Actions may prompt for input, so show the cursor for them;
+                # submenus and 'back' keep it hidden
+                item = self.items.get(choice)
+                if item is not None and item.submenu is None:
+                    self._show_cursor()
+                
                 if not self._execute_choice(choice):
                     break
                 
+                # Hide again after an action, or after a submenu restored it on exit
+                self._hide_cursor()
+                
                 # After first interaction, don't clear on next menu display
                 clear_first = False
         finally: